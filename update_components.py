@@ -4,24 +4,162 @@ Script para actualizar automáticamente los componentes de Lovelace
 desde sus repositorios originales.
 """
 
+from __future__ import annotations
+
 import json
 import os
-import requests
-import subprocess
-import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 import logging
 
+# requests y hashlib se importan solo donde se usan: una ejecución en la que todos
+# los componentes están en periodo de espera no necesita cargarlos
+if TYPE_CHECKING:
+    import requests
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Número máximo de componentes que se actualizan en paralelo
+MAX_WORKERS = 8
+# Número máximo de archivos que se descargan en paralelo por componente
+MAX_DOWNLOAD_WORKERS = 4
+# Intentos por petición a la API ante errores transitorios o límites de GitHub
+MAX_RETRIES = 6
+# Espera máxima (segundos) aceptable para que se renueve el límite de peticiones
+MAX_RATE_LIMIT_WAIT = 15 * 60
+# Tamaño de bloque al escribir descargas en disco
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Tamaño de bloque al calcular hashes de archivos sin hashlib.file_digest
+HASH_CHUNK_SIZE = 1024 * 1024
+# Horas durante las que no se vuelve a consultar un componente ya verificado
+DEFAULT_COOLDOWN_HOURS = 1.0
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+# Máximo de assets por release que permite pedir GraphQL en una página
+GRAPHQL_MAX_ASSETS = 100
+GITHUB_RAW_URL = "https://raw.githubusercontent.com"
+
+# owner/repo de una URL de GitHub (https o ssh, con o sin .git o ruta adicional;
+# esquema y host sin distinguir mayúsculas)
+_OWNER_REPO_RE = re.compile(
+    r"(?i:https?://(?:www\.)?github\.com/|git@github\.com:)([^/]+)/([^/#?]+?)(?:\.git)?(?:[/#?]|$)"
+)
+
+@dataclass(slots=True)
+class FileSpec:
+    """Archivo a copiar desde el repositorio original."""
+    source: str
+    destination: str
+
+@dataclass(slots=True)
+class ComponentSpec:
+    """Configuración de un componente, validada al cargar components_config.json."""
+    name: str
+    source_url: str
+    owner: str
+    repo: str
+    use_releases: bool
+    files: List[FileSpec]
+    
+    @classmethod
+    def from_config(cls, name: str, config: Dict) -> "ComponentSpec":
+        """Construye la especificación de un componente a partir de su entrada en el JSON."""
+        try:
+            source_url = config["source_url"]
+            files = [FileSpec(f["source"], f["destination"]) for f in config["files"]]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Configuración inválida para el componente {name}: {e!r}") from e
+        
+        # owner/repo se extraen una sola vez por componente
+        match = _OWNER_REPO_RE.match(source_url)
+        if not match:
+            raise ValueError(f"URL de repositorio inválida para el componente {name}: {source_url}")
+        
+        return cls(
+            name=name,
+            source_url=source_url,
+            owner=match.group(1),
+            repo=match.group(2),
+            use_releases=bool(config.get("use_releases", True)),
+            files=files
+        )
+
+def _write_json_atomic(path: str, data: Dict):
+    """Escribe un JSON de forma atómica: un fallo a mitad de escritura no deja el archivo truncado."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
 class ComponentUpdater:
-    def __init__(self, config_file: str = "components_config.json"):
+    def __init__(self, config_file: str = "components_config.json",
+                 cache_file: str = ".updater_cache.json",
+                 cooldown_hours: float = DEFAULT_COOLDOWN_HOURS):
         self.config_file = config_file
+        self.cooldown_hours = cooldown_hours
         self.config = self._load_config()
-        
+        # Configuración validada; self.config conserva el JSON original por compatibilidad
+        self.components = {name: ComponentSpec.from_config(name, data) for name, data in self.config.items()}
+        self.cache_file = cache_file
+        self.cache = self._load_cache()
+        self._cache_lock = threading.Lock()
+        self._cache_dirty = False
+        # Respuestas (o errores 404) ya obtenidos durante esta ejecución, por URL de la API
+        self._responses: Dict[str, Union[Dict, requests.HTTPError]] = {}
+        # Últimos releases obtenidos en bloque vía GraphQL, por (owner, repo)
+        self._latest_releases: Dict[Tuple[str, str], Optional[Dict]] = {}
+        # Autenticarse con GitHub si hay token (sube el límite de 60 a 5000 peticiones/hora)
+        token = os.environ.get("GITHUB_TOKEN")
+        self._auth_headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self._headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            **self._auth_headers
+        }
+        # Límite de peticiones según las cabeceras X-RateLimit-*: (restantes, renovación)
+        # por recurso ("core" para REST, "graphql"), ya que cada uno tiene su propia cuota
+        self._rate_limits: Dict[str, Tuple[int, float]] = {}
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self) -> requests.Session:
+        """Sesión HTTP compartida, creada en la primera petición."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                
+                # Mantiene conexiones keep-alive (TCP+TLS) abiertas por host para no
+                # repetir el handshake en cada petición a api.github.com o github.com
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_maxsize=MAX_WORKERS * MAX_DOWNLOAD_WORKERS)
+                self._session.mount("https://", adapter)
+            return self._session
+    
+    def __enter__(self) -> "ComponentUpdater":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Cierra las conexiones HTTP abiertas."""
+        if self._session is not None:
+            self._session.close()
+    
     def _load_config(self) -> Dict:
         """Carga la configuración de componentes desde el archivo JSON."""
         try:
@@ -31,13 +169,182 @@ class ComponentUpdater:
             logger.error(f"Archivo de configuración {self.config_file} no encontrado")
             return {}
     
+    def _load_cache(self) -> Dict:
+        """Carga la caché local (respuestas de la API, descargas y última verificación de cada componente)."""
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            cache = {}
+        cache.setdefault("api", {})
+        cache.setdefault("last_checked", {})
+        cache.setdefault("downloads", {})
+        return cache
+    
+    def _save_cache(self):
+        """Guarda la caché local (respuestas de la API, descargas y última verificación) si cambió."""
+        with self._cache_lock:
+            if not self._cache_dirty:
+                return
+            _write_json_atomic(self.cache_file, self.cache)
+            self._cache_dirty = False
+    
+    def _rate_limit_resource(self, url: str) -> str:
+        """Recurso de GitHub cuya cuota consume una petición a la URL dada."""
+        return "graphql" if url == GITHUB_GRAPHQL_URL else "core"
+    
+    def _update_rate_limit(self, response: requests.Response, resource: str):
+        """Registra el límite de peticiones restante informado por GitHub."""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset is not None:
+            resource = response.headers.get("X-RateLimit-Resource", resource)
+            self._rate_limits[resource] = (int(remaining), float(reset))
+    
+    def _wait_for_rate_limit(self, resource: str):
+        """Espera a que se renueve el límite de peticiones del recurso si está agotado."""
+        remaining, reset = self._rate_limits.get(resource, (None, 0.0))
+        if remaining != 0:
+            return
+        wait = reset - time.time()
+        if 0 < wait <= MAX_RATE_LIMIT_WAIT:
+            logger.warning(f"Límite de peticiones de GitHub agotado, esperando {wait:.0f}s")
+            time.sleep(wait)
+    
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """Convierte Retry-After (segundos o fecha HTTP) en segundos de espera, o None si no es válido."""
+        import email.utils
+        
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(retry_at.timestamp() - time.time(), 0)
+    
+    def _get_retry_delay(self, response: requests.Response, attempt: int) -> Optional[float]:
+        """Devuelve cuántos segundos esperar antes de reintentar, o None si no hay que reintentar."""
+        rate_limited = response.status_code == 429 or (
+            response.status_code == 403 and (
+                "Retry-After" in response.headers
+                or response.headers.get("X-RateLimit-Remaining") == "0"
+            )
+        )
+        if not rate_limited and response.status_code < 500:
+            return None
+        
+        retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return retry_after
+        reset = response.headers.get("X-RateLimit-Reset")
+        if response.headers.get("X-RateLimit-Remaining") == "0" and reset is not None:
+            return max(float(reset) - time.time(), 0)
+        # Backoff exponencial: 1, 2, 4, 8, 16... segundos
+        return float(2 ** attempt)
+    
+    def _request_api(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Hace una petición a la API de GitHub respetando su límite y reintentando errores transitorios."""
+        import requests
+        
+        resource = self._rate_limit_resource(url)
+        for attempt in range(MAX_RETRIES):
+            last_attempt = attempt == MAX_RETRIES - 1
+            self._wait_for_rate_limit(resource)
+            try:
+                response = self.session.request(method, url, timeout=30, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_attempt:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(f"Error de conexión con {url}: {e}. Reintentando en {delay}s")
+                time.sleep(delay)
+                continue
+            
+            self._update_rate_limit(response, resource)
+            delay = self._get_retry_delay(response, attempt)
+            if delay is None or last_attempt:
+                return response
+            if delay > MAX_RATE_LIMIT_WAIT:
+                logger.error(f"GitHub pide esperar {delay:.0f}s para {url}, se cancela la petición")
+                return response
+            
+            logger.warning(f"GitHub respondió {response.status_code} para {url}. Reintentando en {delay:.0f}s")
+            time.sleep(delay)
+    
+    def _slim_api_body(self, body: Dict) -> Dict:
+        """Conserva solo los campos de un release o commit que usa el actualizador."""
+        slim = {}
+        if "tag_name" in body:
+            slim["tag_name"] = body["tag_name"]
+            slim["assets"] = [
+                {"name": asset["name"], "browser_download_url": asset["browser_download_url"]}
+                for asset in body.get("assets", [])
+            ]
+        if "sha" in body:
+            slim["sha"] = body["sha"]
+        return slim
+    
+    def _get_json(self, api_url: str) -> Dict:
+        """Consulta la API de GitHub reutilizando la respuesta cacheada si no cambió (ETag)."""
+        import requests
+        
+        if api_url in self._responses:
+            result = self._responses[api_url]
+            if isinstance(result, requests.HTTPError):
+                raise result
+            return result
+        
+        cached = self.cache["api"].get(api_url)
+        headers = dict(self._headers)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+        
+        response = self._request_api("GET", api_url, headers=headers)
+        # Las respuestas 304 no consumen el límite de peticiones de GitHub
+        if response.status_code == 304 and cached:
+            self._responses[api_url] = cached["body"]
+            return cached["body"]
+        
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            # Un 404 (sin releases, rama inexistente) no cambiará durante esta ejecución
+            if response.status_code == 404:
+                self._responses[api_url] = e
+            raise
+        body = self._slim_api_body(response.json())
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._cache_lock:
+                self.cache["api"][api_url] = {"etag": etag, "body": body}
+                self._cache_dirty = True
+        self._responses[api_url] = body
+        return body
+    
+    def _checked_recently(self, component_name: str) -> bool:
+        """Indica si el componente se verificó dentro del periodo de espera."""
+        last_checked = self.cache["last_checked"].get(component_name)
+        if last_checked is None:
+            return False
+        return time.time() - last_checked < self.cooldown_hours * 3600
+    
+    def _mark_checked(self, component_name: str):
+        """Registra que el componente se verificó (y está al día) en este momento."""
+        with self._cache_lock:
+            self.cache["last_checked"][component_name] = time.time()
+            self._cache_dirty = True
+    
     def _save_version_info(self, component_name: str, version_info: Dict):
         """Guarda información de versión para un componente."""
         version_file = os.path.join(component_name, "version.json")
         os.makedirs(component_name, exist_ok=True)
         
-        with open(version_file, 'w') as f:
-            json.dump(version_info, f, indent=2)
+        _write_json_atomic(version_file, version_info)
     
     def _get_current_version(self, component_name: str) -> Optional[Dict]:
         """Obtiene la versión actual de un componente."""
@@ -48,81 +355,218 @@ class ComponentUpdater:
         except FileNotFoundError:
             return None
     
-    def _get_latest_release(self, repo_url: str) -> Optional[Dict]:
-        """Obtiene información del último release de un repositorio de GitHub."""
-        # Extraer owner/repo de la URL
-        parts = repo_url.replace("https://github.com/", "").split("/")
-        if len(parts) < 2:
-            logger.error(f"URL de repositorio inválida: {repo_url}")
-            return None
+    def _graphql_latest_releases(self, repos: List[Tuple[str, str]]) -> Optional[Dict[Tuple[str, str], Optional[Dict]]]:
+        """Obtiene el último release de varios repositorios en una sola consulta GraphQL.
         
-        owner, repo = parts[0], parts[1]
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/releases/latest"
+        Devuelve, por (owner, repo), el release con el mismo formato que la API REST
+        (None si no tiene releases), o None si la consulta falla. Los repositorios que
+        no aparecen en la respuesta se omiten para consultarlos por REST.
+        """
+        import requests
+        
+        fields = (
+            f"latestRelease {{ tagName releaseAssets(first: {GRAPHQL_MAX_ASSETS}) "
+            "{ pageInfo { hasNextPage } nodes { name downloadUrl } } }"
+        )
+        query = "query {\n" + "\n".join(
+            f"  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) {{ {fields} }}"
+            for i, (owner, repo) in enumerate(repos)
+        ) + "\n}"
         
         try:
-            response = requests.get(api_url, timeout=30)
+            response = self._request_api("POST", GITHUB_GRAPHQL_URL, headers=self._headers,
+                                         json={"query": query})
             response.raise_for_status()
-            return response.json()
+            payload = response.json()
         except requests.RequestException as e:
-            logger.error(f"Error al obtener release de {repo_url}: {e}")
+            logger.error(f"Error en la consulta GraphQL de releases: {e}")
             return None
-    
-    def _get_latest_commit(self, repo_url: str, branch: str = "master") -> Optional[Dict]:
-        """Obtiene información del último commit de un repositorio."""
-        parts = repo_url.replace("https://github.com/", "").split("/")
-        if len(parts) < 2:
+        
+        # GitHub puede responder 200 con "errors" (p.ej. RATE_LIMITED o permisos del token)
+        data = payload.get("data")
+        if not data or payload.get("errors"):
+            logger.error(f"Error en la consulta GraphQL de releases: {payload.get('errors')}")
             return None
-            
-        owner, repo = parts[0], parts[1]
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/commits/{branch}"
+        
+        releases = {}
+        for i, key in enumerate(repos):
+            repository = data.get(f"r{i}")
+            if not repository:
+                continue
+            release = repository.get("latestRelease")
+            # Con más assets de los que caben en una página, el asset buscado podría faltar
+            if release and release["releaseAssets"]["pageInfo"]["hasNextPage"]:
+                continue
+            if release:
+                release = {
+                    "tag_name": release["tagName"],
+                    "assets": [
+                        {"name": asset["name"], "browser_download_url": asset["downloadUrl"]}
+                        for asset in release["releaseAssets"]["nodes"]
+                    ]
+                }
+            releases[key] = release
+        return releases
+    
+    def _prefetch_latest_releases(self, skip_recently_checked: bool = False):
+        """Precarga en una sola petición los releases de todos los componentes que los usan.
+        
+        Con skip_recently_checked se omiten los componentes en periodo de espera, que
+        update_component no va a consultar.
+        """
+        # La API GraphQL de GitHub requiere autenticación
+        if "Authorization" not in self._headers:
+            return
+        
+        repos = []
+        for spec in self.components.values():
+            if skip_recently_checked and self._checked_recently(spec.name):
+                continue
+            if spec.use_releases and (spec.owner, spec.repo) not in repos:
+                repos.append((spec.owner, spec.repo))
+        if not repos:
+            return
+        
+        releases = self._graphql_latest_releases(repos)
+        if releases is not None:
+            self._latest_releases.update(releases)
+    
+    def _get_latest_release(self, owner: str, repo: str) -> Optional[Dict]:
+        """Obtiene información del último release de un repositorio de GitHub."""
+        import requests
+        
+        if (owner, repo) in self._latest_releases:
+            return self._latest_releases[(owner, repo)]
+        
+        api_url = f"https://api.github.com/repos/{owner}/{repo}/releases/latest"
         
         try:
-            response = requests.get(api_url, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(api_url)
         except requests.RequestException as e:
-            # Intentar con rama 'main' si 'master' falla
-            if branch == "master":
-                return self._get_latest_commit(repo_url, "main")
-            logger.error(f"Error al obtener commit de {repo_url}: {e}")
+            logger.error(f"Error al obtener release de {owner}/{repo}: {e}")
             return None
     
-    def _download_file(self, url: str, destination: str) -> bool:
-        """Descarga un archivo desde una URL."""
+    def _get_latest_commit(self, owner: str, repo: str,
+                           branches: Tuple[str, ...] = ("master", "main")) -> Optional[Dict]:
+        """Obtiene información del último commit de la primera rama existente de un repositorio."""
+        import requests
+        
+        error = None
+        for branch in branches:
+            api_url = f"https://api.github.com/repos/{owner}/{repo}/commits/{branch}"
+            try:
+                return self._get_json(api_url)
+            except requests.RequestException as e:
+                error = e
+        
+        logger.error(f"Error al obtener commit de {owner}/{repo}: {error}")
+        return None
+    
+    def _build_download_url(self, owner: str, repo: str, latest_info: Dict, use_releases: bool,
+                            source_path: str) -> str:
+        """Construye la URL de descarga de un archivo para un release o commit."""
+        if use_releases:
+            # Para releases, usar la URL del asset
+            for asset in latest_info.get("assets", []):
+                if asset["name"] == os.path.basename(source_path):
+                    return asset["browser_download_url"]
+            
+            # Si no hay asset, usar el archivo del tag
+            ref = latest_info["tag_name"]
+        else:
+            ref = latest_info["sha"]
+        
+        # Descargar directamente de raw.githubusercontent.com: {repo_url}/raw/... redirige
+        # allí y costaría una petición extra por archivo
+        return f"{GITHUB_RAW_URL}/{owner}/{repo}/{ref}/{source_path}"
+    
+    def _download_file(self, url: str, destination: str) -> Optional[str]:
+        """Descarga un archivo desde una URL y devuelve su hash SHA256 (None si falla)."""
+        import hashlib
+        import requests
+        
+        sha256_hash = hashlib.sha256()
+        headers = dict(self._auth_headers)
+        # Si el archivo local es el que ya se descargó de esta URL, pedirlo solo si cambió
+        cached = self.cache["downloads"].get(destination)
+        if cached and cached["url"] == url and self._calculate_file_hash(destination) == cached["sha256"]:
+            headers["If-None-Match"] = cached["etag"]
+        
+        # Descargar a un archivo temporal: un corte a mitad de la descarga no trunca el archivo actual
+        tmp_path = f"{destination}.tmp"
         try:
-            response = requests.get(url, timeout=60)
-            response.raise_for_status()
+            # Escribir por bloques sin cargar el archivo completo en memoria
+            with self.session.get(url, headers=headers, timeout=60, stream=True) as response:
+                if response.status_code == 304:
+                    logger.info(f"Sin cambios: {destination}")
+                    return cached["sha256"]
+                response.raise_for_status()
+                
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        # Calcular el hash mientras se descarga evita releer el archivo
+                        sha256_hash.update(chunk)
+                os.replace(tmp_path, destination)
+                etag = response.headers.get("ETag")
             
-            os.makedirs(os.path.dirname(destination), exist_ok=True)
-            with open(destination, 'wb') as f:
-                f.write(response.content)
+            if etag:
+                with self._cache_lock:
+                    self.cache["downloads"][destination] = {
+                        "url": url,
+                        "etag": etag,
+                        "sha256": sha256_hash.hexdigest()
+                    }
+                    self._cache_dirty = True
             
             logger.info(f"Descargado: {destination}")
-            return True
+            return sha256_hash.hexdigest()
         except requests.RequestException as e:
             logger.error(f"Error al descargar {url}: {e}")
-            return False
+            return None
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
     
     def _calculate_file_hash(self, file_path: str) -> str:
-        """Calcula el hash SHA256 de un archivo."""
-        sha256_hash = hashlib.sha256()
+        """Calcula el hash SHA256 de un archivo ya en disco (las descargas calculan el suyo al escribir)."""
+        import hashlib
+        
         try:
-            with open(file_path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
+            with open(file_path, "rb", buffering=0) as f:
+                if hasattr(hashlib, "file_digest"):
+                    return hashlib.file_digest(f, "sha256").hexdigest()
+                # Python < 3.11: leer en bloques grandes para reducir iteraciones y syscalls
+                sha256_hash = hashlib.sha256()
+                for byte_block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
                     sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
+                return sha256_hash.hexdigest()
         except FileNotFoundError:
             return ""
     
     def update_component(self, component_name: str) -> bool:
         """Actualiza un componente específico."""
-        if component_name not in self.config:
+        try:
+            return self._update_component(component_name)
+        finally:
+            # Una escritura de la caché por componente, no una por petición
+            self._save_cache()
+    
+    def _update_component(self, component_name: str) -> bool:
+        """Actualiza un componente específico sin guardar la caché."""
+        spec = self.components.get(component_name)
+        if spec is None:
             logger.error(f"Componente {component_name} no encontrado en configuración")
             return False
         
-        component_config = self.config[component_name]
-        repo_url = component_config["source_url"]
-        files_to_download = component_config["files"]
+        repo_url = spec.source_url
+        
+        # Evitar cualquier petición si se verificó hace poco
+        if self._checked_recently(component_name):
+            logger.info(f"{component_name} se verificó hace menos de {self.cooldown_hours:g}h, se omite (usa --force)")
+            return True
+        
+        owner, repo = spec.owner, spec.repo
         
         logger.info(f"Actualizando {component_name}...")
         
@@ -130,16 +574,16 @@ class ComponentUpdater:
         current_version = self._get_current_version(component_name)
         
         # Determinar si usar releases o commits
-        use_releases = component_config.get("use_releases", True)
+        use_releases = spec.use_releases
         
         if use_releases:
-            latest_info = self._get_latest_release(repo_url)
+            latest_info = self._get_latest_release(owner, repo)
             if not latest_info:
                 logger.warning(f"No se encontraron releases para {component_name}, usando commits")
                 use_releases = False
         
         if not use_releases:
-            latest_info = self._get_latest_commit(repo_url)
+            latest_info = self._get_latest_commit(owner, repo)
         
         if not latest_info:
             logger.error(f"No se pudo obtener información de {component_name}")
@@ -156,37 +600,29 @@ class ComponentUpdater:
         # Verificar si necesita actualización
         if current_hash == latest_version:
             logger.info(f"{component_name} ya está actualizado ({latest_version})")
+            self._mark_checked(component_name)
             return True
         
         logger.info(f"Actualizando {component_name} de {current_hash or 'N/A'} a {latest_version}")
         
-        # Descargar archivos
-        updated_files = []
-        for file_info in files_to_download:
-            source_path = file_info["source"]
-            dest_path = os.path.join(component_name, file_info["destination"])
-            
-            # Construir URL de descarga
-            if use_releases:
-                # Para releases, usar la URL del asset
-                download_url = None
-                for asset in latest_info.get("assets", []):
-                    if asset["name"] == os.path.basename(source_path):
-                        download_url = asset["browser_download_url"]
-                        break
-                
-                if not download_url:
-                    # Si no hay asset, usar raw URL
-                    download_url = f"{repo_url}/raw/{latest_info['tag_name']}/{source_path}"
-            else:
-                # Para commits, usar raw URL
-                download_url = f"{repo_url}/raw/{latest_info['sha']}/{source_path}"
-            
-            if self._download_file(download_url, dest_path):
-                updated_files.append(dest_path)
-            else:
-                logger.error(f"Falló la descarga de {source_path}")
+        # Descargar archivos en paralelo
+        dest_paths = [os.path.join(component_name, f.destination) for f in spec.files]
+        download_urls = [
+            self._build_download_url(owner, repo, latest_info, use_releases, f.source)
+            for f in spec.files
+        ]
+        # Crear cada directorio de destino una sola vez, no una por archivo descargado
+        for directory in {os.path.dirname(p) for p in dest_paths}:
+            os.makedirs(directory, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_DOWNLOAD_WORKERS, len(spec.files)))) as executor:
+            hashes = list(executor.map(self._download_file, download_urls, dest_paths))
+        
+        file_hashes = {}
+        for file_spec, dest_path, file_hash in zip(spec.files, dest_paths, hashes):
+            if file_hash is None:
+                logger.error(f"Falló la descarga de {file_spec.source}")
                 return False
+            file_hashes[dest_path] = file_hash
         
         # Guardar información de versión
         version_info = {
@@ -194,56 +630,80 @@ class ComponentUpdater:
             "source_url": repo_url,
             "last_updated": datetime.now().isoformat(),
             "commit_hash" if not use_releases else "version": latest_version,
-            "files": updated_files,
-            "file_hashes": {f: self._calculate_file_hash(f) for f in updated_files}
+            "files": list(file_hashes),
+            "file_hashes": file_hashes
         }
         
         self._save_version_info(component_name, version_info)
+        self._mark_checked(component_name)
         logger.info(f"✅ {component_name} actualizado exitosamente a {latest_version}")
         return True
     
     def update_all_components(self) -> Dict[str, bool]:
         """Actualiza todos los componentes configurados."""
-        results = {}
-        for component_name in self.config.keys():
-            results[component_name] = self.update_component(component_name)
-        return results
+        names = list(self.components.keys())
+        if not names:
+            return {}
+        
+        self._prefetch_latest_releases(skip_recently_checked=True)
+        
+        # Las descargas son de E/S, se pueden solapar entre componentes
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(names))) as executor:
+            return dict(zip(names, executor.map(self.update_component, names)))
+    
+    def _check_component(self, spec: ComponentSpec) -> Optional[Dict]:
+        """Devuelve la actualización disponible de un componente, o None si está al día."""
+        repo_url = spec.source_url
+        owner, repo = spec.owner, spec.repo
+        current_version = self._get_current_version(spec.name)
+        
+        use_releases = spec.use_releases
+        
+        if use_releases:
+            latest_info = self._get_latest_release(owner, repo)
+            if not latest_info:
+                latest_info = self._get_latest_commit(owner, repo)
+                use_releases = False
+        else:
+            latest_info = self._get_latest_commit(owner, repo)
+        
+        if not latest_info:
+            return None
+        
+        if use_releases:
+            latest_version = latest_info["tag_name"]
+            current = current_version.get("version") if current_version else None
+        else:
+            latest_version = latest_info["sha"][:8]
+            current = current_version.get("commit_hash") if current_version else None
+        
+        if current == latest_version:
+            return None
+        
+        # Un componente desactualizado no debe omitirse luego como "verificado hace poco"
+        with self._cache_lock:
+            if self.cache["last_checked"].pop(spec.name, None) is not None:
+                self._cache_dirty = True
+        return {
+            "current": current or "N/A",
+            "latest": latest_version,
+            "url": repo_url
+        }
     
     def check_for_updates(self) -> Dict[str, Dict]:
         """Verifica si hay actualizaciones disponibles sin descargar."""
-        updates_available = {}
+        names = list(self.components.keys())
+        if not names:
+            return {}
         
-        for component_name in self.config.keys():
-            component_config = self.config[component_name]
-            repo_url = component_config["source_url"]
-            current_version = self._get_current_version(component_name)
-            
-            use_releases = component_config.get("use_releases", True)
-            
-            if use_releases:
-                latest_info = self._get_latest_release(repo_url)
-                if not latest_info:
-                    latest_info = self._get_latest_commit(repo_url)
-                    use_releases = False
-            else:
-                latest_info = self._get_latest_commit(repo_url)
-            
-            if latest_info:
-                if use_releases:
-                    latest_version = latest_info["tag_name"]
-                    current = current_version.get("version") if current_version else None
-                else:
-                    latest_version = latest_info["sha"][:8]
-                    current = current_version.get("commit_hash") if current_version else None
-                
-                if current != latest_version:
-                    updates_available[component_name] = {
-                        "current": current or "N/A",
-                        "latest": latest_version,
-                        "url": repo_url
-                    }
+        self._prefetch_latest_releases()
+        
+        # Solo lectura: todos los componentes se pueden consultar a la vez
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(names))) as executor:
+            results = list(executor.map(self._check_component, self.components.values()))
         
-        return updates_available
+        self._save_cache()
+        return {name: update for name, update in zip(names, results) if update}
 
 def main():
     """Función principal del script."""
@@ -254,39 +714,44 @@ def main():
     parser.add_argument("--component", type=str, help="Actualizar solo un componente específico")
     parser.add_argument("--config", type=str, default="components_config.json", 
                        help="Archivo de configuración")
+    parser.add_argument("--force", action="store_true",
+                       help="Consultar los componentes aunque se hayan verificado recientemente")
     
     args = parser.parse_args()
     
-    updater = ComponentUpdater(args.config)
+    try:
+        updater = ComponentUpdater(args.config, cooldown_hours=0 if args.force else DEFAULT_COOLDOWN_HOURS)
+    except ValueError as e:
+        logger.error(str(e))
+        exit(1)
     
-    if args.check:
-        updates = updater.check_for_updates()
-        if updates:
-            print("Actualizaciones disponibles:")
-            for component, info in updates.items():
-                print(f"  {component}: {info['current']} → {info['latest']}")
+    with updater:
+        if args.check:
+            updates = updater.check_for_updates()
+            if updates:
+                print("Actualizaciones disponibles:")
+                for component, info in updates.items():
+                    print(f"  {component}: {info['current']} → {info['latest']}")
             
-            # Guardar información de actualizaciones para GitHub Actions
-            import json
-            with open('updates.json', 'w') as f:
-                json.dump(updates, f, indent=2)
-        else:
-            print("Todos los componentes están actualizados")
-        
-        # Exit code para GitHub Actions
-        exit(0 if not updates else 1)
-    elif args.component:
-        success = updater.update_component(args.component)
-        exit(0 if success else 1)
-    else:
-        results = updater.update_all_components()
-        failed = [name for name, success in results.items() if not success]
-        if failed:
-            print(f"❌ Falló la actualización de: {', '.join(failed)}")
-            exit(1)
+                # Guardar información de actualizaciones para GitHub Actions
+                _write_json_atomic('updates.json', updates)
+            else:
+                print("Todos los componentes están actualizados")
+        
+            # Exit code para GitHub Actions
+            exit(0 if not updates else 1)
+        elif args.component:
+            success = updater.update_component(args.component)
+            exit(0 if success else 1)
         else:
-            print("✅ Todos los componentes actualizados exitosamente")
-            exit(0)
+            results = updater.update_all_components()
+            failed = [name for name, success in results.items() if not success]
+            if failed:
+                print(f"❌ Falló la actualización de: {', '.join(failed)}")
+                exit(1)
+            else:
+                print("✅ Todos los componentes actualizados exitosamente")
+                exit(0)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file